@@ -1,54 +1,165 @@
-import sqlite3
+import sqlite3, threading, re
+
+IDENTIFIER_REGEX = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
 def dict_factory(cursor, row):
     return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
 
+def quote_identifier(name: str) -> str:
+    """
+    Check that a table or column name is safe to be used in a query
+    """
+    if not IDENTIFIER_REGEX.match(name):
+        raise ValueError(f"Invalid identifier '{name}'")
+
+    return f'"{name}"'
+
 class DB:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, wal: bool = False):
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
+        # The connection is shared with the slideshow loading threads
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = dict_factory
+        # WAL is persistent in the database file, it is only enabled where asked
+        if wal:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
         self.cursor = self.conn.cursor()
+        self.lock = threading.Lock()
+        # SQL text of the statements by table and columns, see _prepare
+        self._stmts: dict[tuple, str] = {}
 
-    def create_table(self, table_name: str, columns: dict):
+    def create_table(self, table_name: str, columns: dict, unique: list = None):
         """
         Create a table with the given name and columns
+        Each set of columns in unique gets a unique index, used to ignore duplicates on insert
         """
 
-        if self.cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'").fetchone():
-            print(f"Table '{table_name}' already exists, skipping...")
-            return False
+        with self.lock:
+            if self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone():
+                print(f"Table '{table_name}' already exists, skipping...")
+                return False
+
+            columns = [f"{quote_identifier(k)} {v}" for k, v in columns.items()]
+
+            self.cursor.execute(f"CREATE TABLE {quote_identifier(table_name)} ({', '.join(columns)})")
 
-        columns = [f"{k} {v}" for k, v in columns.items()]
+        for unique_columns in unique or []:
+            self.create_index(table_name, unique_columns, unique=True)
 
-        self.cursor.execute(f"CREATE TABLE {table_name} ({', '.join(columns)})")
+    def create_index(self, table_name: str, columns: list, unique: bool = False):
+        """
+        Create an index on the given columns to avoid full table scans when searching them
+        """
+
+        index_name = quote_identifier(f"idx_{table_name}_{'_'.join(columns)}")
+        index_columns = ", ".join(quote_identifier(k) for k in columns)
 
-    def insert_row(self, table_name: str, data: dict):
+        with self.lock:
+            self.cursor.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index_name} ON {quote_identifier(table_name)} ({index_columns})")
+
+    def insert_row(self, table_name: str, data: dict, replace: bool = False):
         """
-        Insert a row into the table
+        Insert a row into the table, replacing the existing one on conflict if specified
         """
 
-        columns = list(data.keys())
         values = list(data.values())
+        sql = self._insert_sql(table_name, tuple(data.keys()), "INSERT OR REPLACE" if replace else "INSERT")
+
+        with self.lock:
+            try:
+                self.cursor.execute(sql, values)
+            except sqlite3.IntegrityError as e:
+                print(f"Error: {e}")
+                return None
 
-        try:
-            self.cursor.execute(f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(values))})", values)
-        except sqlite3.IntegrityError as e:
-            print(f"Error: {e}")
-            return None
+            self.conn.commit()
 
-        self.conn.commit()
+            return self.cursor.lastrowid
 
-        return self.cursor.lastrowid
+    def insert_rows(self, table_name: str, rows: list):
+        """
+        Insert many rows in a single transaction, rows already existing are ignored
+        """
+
+        # Group rows by columns so each group is a single statement
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
+
+        inserted = 0
+
+        with self.lock:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            try:
+                for keys, values in groups.items():
+                    self.cursor.executemany(self._insert_sql(table_name, keys, "INSERT OR IGNORE"), values)
+                    inserted += self.cursor.rowcount
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+
+            self.conn.commit()
+
+        return inserted
 
     def get_row(self, table_name: str, column: str, value: str):
         """
         Get a row from the table
         """
 
-        self.cursor.execute(f"SELECT * FROM {table_name} WHERE {column} = ?", (value,))
+        sql = self._select_sql(table_name, (column,))
+
+        with self.lock:
+            self.cursor.execute(sql, (value,))
 
-        return self.cursor.fetchone()
+            return self.cursor.fetchone()
+
+    def get_row_where(self, table_name: str, data: dict):
+        """
+        Get a row from the table matching all the given column values
+        """
+
+        sql = self._select_sql(table_name, tuple(data.keys()))
+
+        with self.lock:
+            self.cursor.execute(sql, tuple(data.values()))
+
+            return self.cursor.fetchone()
+
+    def _prepare(self, key: tuple, build) -> str:
+        """
+        Get the SQL text of a statement, built only once per key
+        The same text is reused so sqlite's statement cache returns the already compiled statement
+        """
+        sql = self._stmts.get(key)
+
+        if sql is None:
+            sql = self._stmts[key] = build()
+
+        return sql
+
+    def _insert_sql(self, table_name: str, columns: tuple, action: str) -> str:
+        """
+        Get the insert statement for the given table and columns
+        """
+        def build():
+            names = ", ".join(quote_identifier(k) for k in columns)
+            return f"{action} INTO {quote_identifier(table_name)} ({names}) VALUES ({', '.join(['?'] * len(columns))})"
+
+        return self._prepare((action, table_name, columns), build)
+
+    def _select_sql(self, table_name: str, columns: tuple) -> str:
+        """
+        Get the select statement matching all the given columns
+        """
+        def build():
+            conditions = " AND ".join(f"{quote_identifier(k)} = ?" for k in columns)
+            return f"SELECT * FROM {quote_identifier(table_name)} WHERE {conditions}"
+
+        return self._prepare(("SELECT", table_name, columns), build)
 
 
 
@@ -62,6 +173,7 @@ if __name__ == "__main__":
     }
 
     db.create_table("locations", struct)
+    db.create_index("locations", ["place"])
 
     data = {
         "picture": "eiffel_tower.jpg",
@@ -70,6 +182,13 @@ if __name__ == "__main__":
 
     db.insert_row("locations", data)
 
+    rows = [
+        {"picture": "eiffel_tower.jpg", "place": "Paris"},
+        {"picture": "big_ben.jpg", "place": "London"},
+    ]
+
+    db.insert_rows("locations", rows)
+
     result = db.get_row("locations", "picture", "eiffel_tower.jpg")
 
     if result:
@@ -0,0 +1,38 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional, coords_batch then uses numpy operations
+    njit = None
+
+def dms_batch(dms, lat_refs, lon_refs, out_lat, out_lon):
+    """
+    Convert an (N, 2, 3) array of latitude and longitude degrees, minutes, seconds to decimal degrees
+    References are the ASCII codes of the hemisphere letters
+    """
+    for i in prange(dms.shape[0]):
+        out_lat[i] = (dms[i, 0, 0] + dms[i, 0, 1] / 60 + dms[i, 0, 2] / 3600) * (1 if lat_refs[i] == ord("N") else -1)
+        out_lon[i] = (dms[i, 1, 0] + dms[i, 1, 1] / 60 + dms[i, 1, 2] / 3600) * (1 if lon_refs[i] == ord("E") else -1)
+
+if njit:
+    dms_batch = njit(parallel=True, fastmath=True, cache=True)(dms_batch)
+
+def coords_batch(dms: list, lat_refs: list, lon_refs: list) -> np.ndarray:
+    """
+    Convert (latitude, longitude) degrees, minutes, seconds pairs and their hemisphere letters
+    to an (N, 2) array of decimal latitude and longitude
+    """
+    dms = np.array(dms, dtype=np.float64).reshape(-1, 2, 3)
+    lat_refs = np.array([ord((ref or " ")[0]) for ref in lat_refs], dtype=np.uint8)
+    lon_refs = np.array([ord((ref or " ")[0]) for ref in lon_refs], dtype=np.uint8)
+
+    if njit:
+        coords = np.empty((dms.shape[0], 2), dtype=np.float64)
+        dms_batch(dms, lat_refs, lon_refs, coords[:, 0], coords[:, 1])
+    else:
+        coords = dms @ np.array([1.0, 1 / 60, 1 / 3600])
+        coords[:, 0] *= np.where(lat_refs == ord("N"), 1, -1)
+        coords[:, 1] *= np.where(lon_refs == ord("E"), 1, -1)
+
+    return coords
@@ -1,4 +1,4 @@
-import threading, os, time
+import threading, time
 
 from slide import SlideShow
 from web import WebApp
@@ -28,7 +28,7 @@ class Services:
         self.configs = {
             "directory": self.slideshow.directory,
             "image_count": len(self.slideshow.image_list),
-            "current_image": self.slideshow.current_image.filename.split(os.sep)[-1],
+            "current_image": self.slideshow.current_name,
             "delay": self.slideshow.delay,
         }
         self.webapp.configs = self.configs.copy()
@@ -36,7 +36,7 @@ class Services:
         services.sync_configs(fetch_delay=2000)
 
     def sync_configs(self, fetch_delay: int = 2000):
-        self.webapp.configs["current_image"] = self.slideshow.current_image.filename.split(os.sep)[-1]
+        self.webapp.configs["current_image"] = self.slideshow.current_name
         if self.configs["delay"] != self.webapp.configs["delay"]:
             self.slideshow.set_delay(self.webapp.configs["delay"])
             self.configs["delay"] = self.webapp.configs["delay"]
@@ -1,10 +1,48 @@
-import os, dotenv, requests, random, hashlib
+import os, dotenv, requests, random, hashlib, pyvips, time, asyncio, aiohttp, piexif, threading, struct
 import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
 from PIL import Image, ImageTk, ExifTags
 from datetime import datetime
 
 from db import DB
 
+IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif"})
+
+THUMBNAIL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "slideshowpy", "thumbs")
+# Thumbnails unused for 30 days are removed, then the oldest ones above 512 MB
+THUMBNAIL_MAX_AGE = 30 * 24 * 3600
+THUMBNAIL_MAX_SIZE = 512 * 1024 * 1024
+
+def dms_to_decimal(dms) -> float:
+    """
+    Convert GPS coordinates stored in the EXIF as degrees, minutes, seconds to decimal degrees
+    """
+    return float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
+
+def is_rational(value) -> bool:
+    """
+    Check if a raw piexif value is a rational stored as a (numerator, denominator) pair
+    """
+    return isinstance(value, tuple) and len(value) == 2 and all(isinstance(v, int) for v in value)
+
+def exif_value(value, value_type: int):
+    """
+    Convert a raw piexif value to the same python types as PIL (float rationals and str)
+    The conversion depends on the stored value as files may not use the type declared for the tag
+    """
+    if isinstance(value, bytes):
+        return value.decode(errors="replace").rstrip("\x00") if value_type == piexif.TYPES.Ascii else value
+
+    # A pair of integers is only ambiguous with short/long values for tags declared as rationals
+    if value_type in (piexif.TYPES.Rational, piexif.TYPES.SRational):
+        if is_rational(value):
+            return value[0] / value[1] if value[1] else 0.0
+        if isinstance(value, tuple) and value and all(is_rational(v) for v in value):
+            return tuple(n / d if d else 0.0 for n, d in value)
+
+    return value
+
 class SlideShow(tk.Tk):
     def __init__(self, directory: str = "."):
         """
@@ -21,41 +59,155 @@ class SlideShow(tk.Tk):
         self.screen_w, self.screen_h = self.winfo_screenwidth(), self.winfo_screenheight()
         self.geometry(f"{self.screen_w}x{self.screen_h}+0+0")
 
+        # Overlay positions and font computed once for all images
+        self._font = ("Ubuntu", 12)
+        self._cx, self._cy = self.screen_w // 2, self.screen_h // 2
+        self._bot_y = self.screen_h - 10
+        self._bot_y_alt = self.screen_h - 30
+        self._right_x = self.screen_w - 20
+
         self.image_list = []
         self.current_image = None
+        self.current_name = None
         self.current_id = 0
 
+        # Images are loaded in the background while the previous one is displayed
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._prefetch: dict[int, Future] = {}
+
+        # Last loaded images (resized image, metadata and coordinates) kept in memory by path and modification time
+        # bounded by their total number of pixels
+        self._img_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self._cache_px = 0
+        self._cache_px_budget = 64 * 1024 * 1024
+        self._cache_lock = threading.Lock()
+
+        # Resized images are stored on disk to skip decoding on the next loop, disabled if the directory is not writable
+        self._thumbnail_cache = True
+        self._executor.submit(self._prune_thumbnails)
+
+        # Keep the connection to the location API alive between requests
+        self._http = requests.Session()
+
         self.canvas = tk.Canvas(self, background="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
 
+        # Canvas items are created once and updated for each image
+        self.photo_image = ImageTk.PhotoImage("RGB", (self.screen_w, self.screen_h))
+        self.canvas.create_image(self._cx, self._cy, anchor="center", image=self.photo_image)
+
+        # Image date top left
+        self._date_id = self.canvas.create_text(20, 10, fill="white", font=self._font, anchor="nw")
+        # Image location bottom left
+        self._loc_id = self.canvas.create_text(20, self._bot_y, fill="white", font=self._font, anchor="sw")
+        self._alt_id = self.canvas.create_text(20, self._bot_y, fill="white", font=self._font, anchor="sw")
+        # Image name bottom right
+        self._name_id = self.canvas.create_text(self._right_x, self._bot_y, fill="white", font=self._font, anchor="se")
+
         self.get_images()
 
     def init_db(self, db_name: str):
         self.db_name = db_name
 
-        self.db = DB(self.db_name)
+        # Written from the loading threads while the slideshow runs
+        self.db = DB(self.db_name, wal=True)
+
+        # Locations are cached on a ~110m grid as pictures taken nearby share the same place
+        geocache_struct = {
+            "lat_q": "REAL NOT NULL",
+            "lon_q": "REAL NOT NULL",
+            "name": "TEXT",
+            "locality": "TEXT",
+            "ts": "INTEGER",
+        }
+
+        self.db.create_table("geocache", geocache_struct, unique=[["lat_q", "lon_q"]])
 
-        struct = {
+        # Metadata of indexed pictures, filled by index_directory
+        photos_struct = {
             "id": "INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL",
-            "picture_name": "TEXT NOT NULL",
-            "picture_hash": "TEXT UNIQUE NOT NULL",
-            "location": "TEXT",
+            "path": "TEXT UNIQUE NOT NULL",
+            "date": "TEXT",
+            "lat": "REAL",
+            "lon": "REAL",
         }
 
-        self.db.create_table("locations", struct)
+        self.db.create_table("photos", photos_struct)
 
     def get_images(self):
         """
         Get all images from the directory and shuffle them
         """
-        for root, _, files in os.walk(self.directory):
-            for file in files:
-                if any(file.lower().endswith(x) for x in [".jpg", ".jpeg", ".png", ".gif"]):
-                    img_path = os.path.join(root, file)
-                    self.image_list.append(img_path)
+        self.image_list.extend(path for path, _ in self._iter_images(self.directory))
 
         random.shuffle(self.image_list)
 
+    def _iter_images(self, root: str):
+        """
+        Recursively yield image paths with their modification time when it is free to get, else None
+        Only Windows scandir entries hold the stat result, elsewhere it would cost a syscall per file
+        Unreadable directories and files removed during the scan are skipped, like os.walk does
+        """
+        stack = [root]
+
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.rpartition(".")[2].lower() in IMAGE_EXTENSIONS:
+                            # Symlinks are followed by stat so they are not cached either
+                            free_stat = os.name == "nt" and not entry.is_symlink()
+                            yield entry.path, entry.stat().st_mtime if free_stat else None
+                    except OSError:
+                        continue
+
+    def index_directory(self, root: str) -> list:
+        """
+        Index the date and coordinates of all images in a directory without decoding them
+        """
+        rows = []
+        gps_rows = []
+        gps_infos = []
+
+        for path, mtime in self._iter_images(root):
+            image_data = self.parse_image_data(path)
+            exif_date = image_data.get("DateTimeOriginal", image_data.get("DateTime"))
+
+            try:
+                date = self.get_image_date(path, exif_date, mtime)
+            except OSError:
+                # File removed since the directory was scanned
+                continue
+
+            row = {
+                "path": path,
+                "date": date,
+                "lat": None,
+                "lon": None,
+            }
+            rows.append(row)
+
+            gps_info = image_data.get("GPSInfo", {})
+            # Latitude (2) and longitude (4) tags are required to get the coordinates, as degrees, minutes, seconds
+            if all(isinstance(gps_info.get(k), tuple) and len(gps_info[k]) == 3 for k in (2, 4)):
+                gps_rows.append(row)
+                gps_infos.append(gps_info)
+
+        if gps_infos:
+            for row, (lat, lon) in zip(gps_rows, self.get_image_coords_batch(gps_infos)):
+                row["lat"], row["lon"] = float(lat), float(lon)
+
+        self.db.insert_rows("photos", rows)
+
+        return rows
+
     def start_slideshow(self):
         """
         Select an image from the list and display it with a delay
@@ -64,10 +216,26 @@ class SlideShow(tk.Tk):
         if not hasattr(self, "delay"):
             self.delay = 2
 
-        image = self.image_list[self.current_id]
+        shown_id = self.current_id
+        # Use the prefetched image if available, else load it and wait for it
+        future = self._prefetch.get(shown_id) or self._executor.submit(self._load_image, self.image_list[shown_id])
+
         # Select next image using its shuffle id (non repeatable until looping is complete)
         self.current_id = (self.current_id + 1) % len(self.image_list)
-        self.show_image(image)
+
+        try:
+            self._render(future.result())
+        except Exception as e:
+            # Keep the previous image on screen and continue with the next one, it will be loaded again next time
+            print(f"Error: could not load '{self.image_list[shown_id]}': {e}")
+            future = None
+
+        # Keep the shown image for back navigation and start loading the next one
+        next_future = future if self.current_id == shown_id else self._prefetch.get(self.current_id)
+        self._prefetch = {self.current_id: next_future or self._executor.submit(self._load_image, self.image_list[self.current_id])}
+        if future:
+            self._prefetch[shown_id] = future
+
         self.after(self.delay * 1000, self.start_slideshow)
 
     def set_delay(self, delay: int):
@@ -76,22 +244,38 @@ class SlideShow(tk.Tk):
         """
         self.delay = delay
 
-    def parse_image_data(self, image_obj: Image) -> dict:
+    def parse_image_data(self, filepath: str) -> dict:
         """
-        Get image data from exif
+        Get image data from exif without opening the image, GPS data is kept raw in GPSInfo
         """
-        exif = image_obj._getexif()
+        try:
+            exif = piexif.load(filepath)
+        except (piexif.InvalidImageDataError, ValueError, struct.error, IndexError, KeyError):
+            # Formats without EXIF support (PNG, GIF) or malformed EXIF
+            return {}
+
+        image_data = {
+            piexif.TAGS[ifd][k]["name"]: exif_value(v, piexif.TAGS[ifd][k]["type"])
+            for ifd in ("0th", "Exif") for k, v in exif[ifd].items() if k in piexif.TAGS[ifd]
+        }
+
+        if exif["GPS"]:
+            image_data["GPSInfo"] = {k: exif_value(v, piexif.TAGS["GPS"][k]["type"]) for k, v in exif["GPS"].items() if k in piexif.TAGS["GPS"]}
 
-        return {ExifTags.TAGS[k]: v for k, v in exif.items() if k in ExifTags.TAGS} if exif else {}
+        return image_data
 
-    def get_image_date(self, image_path: str, image_date: str) -> str:
+    def get_image_date(self, image_path: str, image_date: str, mtime_hint: float = None) -> str:
         """
-        Parse date using exif data if exists, else use file modification date
+        Parse date using exif data if exists and valid, else use file modification date (given or read from the file)
         """
-        if image_date:
-            date = datetime.strptime(image_date, "%Y:%m:%d %H:%M:%S")
-        else:
-            date = datetime.fromtimestamp(os.stat(image_path).st_mtime)
+        try:
+            date = datetime.strptime(image_date, "%Y:%m:%d %H:%M:%S") if image_date else None
+        except (ValueError, TypeError):
+            # Invalid EXIF date such as 0000:00:00 00:00:00 from cameras with an unset clock
+            date = None
+
+        if not date:
+            date = datetime.fromtimestamp(mtime_hint if mtime_hint is not None else os.stat(image_path).st_mtime)
 
         return date.strftime("%d/%m/%Y %H:%M:%S")
 
@@ -103,9 +287,6 @@ class SlideShow(tk.Tk):
         coords_data = {ExifTags.GPSTAGS[k]: v for k, v in gps_info.items() if k in ExifTags.GPSTAGS}
 
         if coords_data:
-            # Convert the GPS coordinates stored in the EXIF to degrees in float format
-            dms_to_decimal = lambda dms: float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
-
             lat = + dms_to_decimal(coords_data.get("GPSLatitude"))
             lon = + dms_to_decimal(coords_data.get("GPSLongitude"))
             alt = round(coords_data.get("GPSAltitude"))
@@ -117,65 +298,322 @@ class SlideShow(tk.Tk):
 
         return lat, lon, alt
 
+    def get_image_coords_batch(self, gps_infos: list):
+        """
+        Get the coordinates of many images at once as a numpy array of latitude and longitude
+        """
+        # Imported here as numpy and numba are slow to load and only needed when indexing
+        from gps import coords_batch
+
+        coords_data = [{ExifTags.GPSTAGS[k]: v for k, v in gps_info.items() if k in ExifTags.GPSTAGS} for gps_info in gps_infos]
+
+        dms = [(c["GPSLatitude"], c["GPSLongitude"]) for c in coords_data]
+        lat_refs = [c.get("GPSLatitudeRef") for c in coords_data]
+        lon_refs = [c.get("GPSLongitudeRef") for c in coords_data]
+
+        return coords_batch(dms, lat_refs, lon_refs)
+
     def get_image_location(self, lat, lon):
         """
-        Get the place at which the image was taken using latitude and longitude
+        Get the place at which the image was taken using latitude and longitude, None if unknown and the API is unavailable
+        Places are cached in the database to avoid calling the API for nearby pictures
+        """
+        coords = {
+            "lat_q": round(lat, 3),
+            "lon_q": round(lon, 3),
+        }
+
+        cached = self.db.get_row_where("geocache", coords)
+
+        if cached:
+            return f"{cached['name']}, {cached['locality']}"
+
+        if not os.environ.get("API_KEY"):
+            return None
+
+        # Short timeouts so a slow API never blocks the slideshow, None is returned on any error
+        try:
+            req = self._http.get(self._location_url(lat, lon), timeout=(2, 5))
+            req.raise_for_status()
+            place = req.json()["data"][0]
+        except (requests.RequestException, ValueError, KeyError, IndexError):
+            return None
+
+        data = {
+            **coords,
+            "name": place["name"],
+            "locality": place["locality"],
+            "ts": int(time.time()),
+        }
+
+        self.db.insert_row("geocache", data, replace=True)
+
+        return f"{data['name']}, {data['locality']}"
+
+    def geocode_bulk(self, coords: list) -> list:
+        """
+        Get the places of many (latitude, longitude) pairs, uncached ones are requested concurrently
+        """
+        keys = [(round(lat, 3), round(lon, 3)) for lat, lon in coords]
+
+        places = {}
+        for lat_q, lon_q in set(keys):
+            cached = self.db.get_row_where("geocache", {"lat_q": lat_q, "lon_q": lon_q})
+            if cached:
+                places[(lat_q, lon_q)] = f"{cached['name']}, {cached['locality']}"
+
+        missing = [key for key in set(keys) if key not in places]
+
+        if missing:
+            results = asyncio.run(self._fetch_locations(missing))
+
+            rows = []
+            for (lat_q, lon_q), result in zip(missing, results):
+                if not result:
+                    places[(lat_q, lon_q)] = ""
+                    continue
+
+                rows.append({
+                    "lat_q": lat_q,
+                    "lon_q": lon_q,
+                    "name": result["name"],
+                    "locality": result["locality"],
+                    "ts": int(time.time()),
+                })
+                places[(lat_q, lon_q)] = f"{result['name']}, {result['locality']}"
+
+            self.db.insert_rows("geocache", rows)
+
+        return [places[key] for key in keys]
+
+    async def _fetch_locations(self, coords: list) -> list:
+        """
+        Request the places of all coordinates with at most 20 requests at the same time
+        """
+        sem = asyncio.Semaphore(20)
+        connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+        # Same connect and read timeouts as get_image_location
+        timeout = aiohttp.ClientTimeout(sock_connect=2, sock_read=5)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(*[self._fetch_location(session, sem, lat, lon) for lat, lon in coords])
+
+    async def _fetch_location(self, session, sem, lat: float, lon: float) -> dict:
+        """
+        Request the place of a single coordinate, returns None on error
+        """
+        try:
+            async with sem, session.get(self._location_url(lat, lon)) as req:
+                if not req.ok:
+                    return None
+
+                return (await req.json())["data"][0]
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, IndexError):
+            # A failing request must not cancel the other ones
+            return None
+
+    def _location_url(self, lat: float, lon: float) -> str:
+        """
+        Build the location API url for the given coordinates
         """
         key = os.environ.get("API_KEY")
-        url = f"http://api.positionstack.com/v1/reverse?access_key={key}&query={lat},{lon}&limit=1"
-        req = requests.get(url)
 
-        return req.json()["data"][0]["name"] + ", " + req.json()["data"][0]["locality"] if req.ok else ""
+        return f"http://api.positionstack.com/v1/reverse?access_key={key}&query={lat},{lon}&limit=1"
+
+    def destroy(self):
+        """
+        Stop the background loading before closing the window
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        tk.Tk.destroy(self)
 
     def show_image(self, filepath: str):
         """
-        Resize the image to fit the screen without exceeding the original image size / specified size
+        Load and display an image immediately
+        """
+        self._render(self._load_image(filepath))
+
+    def _load_image(self, filepath: str) -> tuple:
+        """
+        Get the image ready to be displayed from the memory cache, else read it and evict the least recently used images
+        This part is slow (disk, decoding, API) and runs outside of the tkinter thread
         """
-        self.current_image = Image.open(filepath)
+        # Read on each load (in the loading thread) so a file modified while the slideshow runs
+        # gets a new key, both here and for the disk thumbnail
+        mtime = os.stat(filepath).st_mtime
+        key = (filepath, mtime)
 
-        image_name = filepath.split(os.sep)[-1]
-        image_data = self.parse_image_data(self.current_image)
-        image_date = self.get_image_date(filepath, image_data.get("DateTimeOriginal", image_data.get("DateTime")))
+        with self._cache_lock:
+            cached = self._img_cache.get(key)
+            if cached:
+                self._img_cache.move_to_end(key)
+
+        if not cached:
+            cached = self._read_image(filepath, mtime)
+
+            with self._cache_lock:
+                if key not in self._img_cache:
+                    self._img_cache[key] = cached
+                    self._cache_px += cached[0].width * cached[0].height
+
+                while self._cache_px > self._cache_px_budget and len(self._img_cache) > 1:
+                    _, (evicted, _, _) = self._img_cache.popitem(last=False)
+                    self._cache_px -= evicted.width * evicted.height
+
+        image, metadata, image_coords = cached
+
+        # The place is not kept in memory, it is read from the database cache on each load so a failed API call is retried
+        metadata = {**metadata, "location": self._image_location(image_coords)}
+
+        return self._letterbox(image), metadata
+
+    def _read_image(self, filepath: str, mtime: float) -> tuple:
+        """
+        Open, parse and resize the image to fit the screen without exceeding the original image size / specified size
+        Returns the resized image, its metadata and its coordinates (None without GPS data)
+        """
+        image_name = os.path.basename(filepath)
+        image_data = self.parse_image_data(filepath)
+        image_date = self.get_image_date(filepath, image_data.get("DateTimeOriginal", image_data.get("DateTime")), mtime)
 
         if image_data.get("GPSInfo"):
             image_coords = self.get_image_coords(image_data.get("GPSInfo"))
             image_alt = f"Altitude : {image_coords[2]}m"
+        else:
+            image_coords = None
+            image_alt = None
+
+        image = self._resize_image(filepath, mtime)
+
+        metadata = {
+            "name": image_name,
+            "date": image_date,
+            "altitude": image_alt,
+        }
 
-            image_hash = hashlib.sha256(self.current_image.tobytes()).hexdigest()
-            image_query = self.db.get_row("locations", "picture_hash", image_hash)
+        return image, metadata, image_coords
 
-            if image_query:
-                image_loc = image_query["location"]
-            elif os.environ.get("API_KEY"):
-                image_loc = self.get_image_location(image_coords[0], image_coords[1])
+    def _image_location(self, image_coords: tuple) -> str:
+        """
+        Get the place to display for the image coordinates
+        """
+        if not image_coords:
+            return "Lieu non défini"
+
+        image_loc = self.get_image_location(image_coords[0], image_coords[1])
+
+        if image_loc is None:
+            # No API key or API unavailable, nothing is saved so the place is requested next time
+            image_loc = f"Lat : {image_coords[0]}, Lon : {image_coords[1]}"
+
+        return image_loc
+
+    def _resize_image(self, filepath: str, mtime: float = None) -> Image:
+        """
+        Decode the image directly at screen size using libvips shrink-on-load
+        Orientation is applied and images smaller than the screen are never upscaled, resized ones are cached on disk
+        """
+        thumbnail_path = self._thumbnail_path(filepath, mtime)
 
-                data = {
-                    "picture_name": image_name,
-                    "picture_hash": image_hash,
-                    "location": image_loc,
-                }
+        if os.path.exists(thumbnail_path):
+            vips_image = pyvips.Image.new_from_file(thumbnail_path, access="sequential")
 
-                self.db.insert_row("locations", data)
-            else:
-                image_loc = f"Lat : {image_coords[0]}, Lon : {image_coords[1]}"
+            # Mark the thumbnail as recently used for the pruning
+            try:
+                os.utime(thumbnail_path)
+            except OSError:
+                pass
         else:
-            image_coords = (0, 0, 0)
-            image_alt = None
-            image_loc = "Lieu non défini"
+            # Only the header is read here to know if the image was actually shrunk
+            source = pyvips.Image.new_from_file(filepath)
+            source_px = source.width * source.height
+            vips_image = pyvips.Image.thumbnail(filepath, self.screen_w, height=self.screen_h, size="down")
+            resized = vips_image.width * vips_image.height < source_px
 
-        self.current_image.thumbnail((self.screen_w, self.screen_h), Image.Resampling.LANCZOS)
+            # Convert grayscale, CMYK or 16 bits images to 8 bits sRGB for tkinter
+            if vips_image.interpretation != "srgb":
+                vips_image = vips_image.colourspace("srgb")
 
-        self.photo_image = ImageTk.PhotoImage(self.current_image)
-        self.canvas.delete("all")
-        self.canvas.create_image(self.screen_w / 2, self.screen_h / 2, anchor="center", image=self.photo_image)
+            # Images already fitting the screen are cheap to decode, JPEG has no transparency
+            if resized and not vips_image.hasalpha() and self._thumbnail_cache:
+                vips_image = vips_image.copy_memory()
 
-        # Image date top left
-        self.canvas.create_text(20, 10, text=image_date, fill="white", font=("Ubuntu", 12), anchor="nw")
-        # Image location bottom left
-        self.canvas.create_text(20, self.screen_h - (30 if image_alt else 10), text=image_loc, fill="white", font=("Ubuntu", 12), anchor="sw")
-        self.canvas.create_text(20, self.screen_h - 10, text=image_alt, fill="white", font=("Ubuntu", 12), anchor="sw")
-        # Image name bottom right
-        self.canvas.create_text(self.screen_w - 20, self.screen_h - 10, text=image_name, fill="white", font=("Ubuntu", 12), anchor="se")
+                try:
+                    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+                    vips_image.jpegsave(thumbnail_path + ".tmp", Q=85)
+                    os.replace(thumbnail_path + ".tmp", thumbnail_path)
+                except (OSError, pyvips.Error) as e:
+                    print(f"Error: thumbnails cache disabled: {e}")
+                    self._thumbnail_cache = False
+
+        mode = "RGBA" if vips_image.hasalpha() else "RGB"
+
+        return Image.frombuffer(mode, (vips_image.width, vips_image.height), vips_image.write_to_memory(), "raw", mode, 0, 1)
+
+    def _thumbnail_path(self, filepath: str, mtime: float = None) -> str:
+        """
+        Get the cached thumbnail path, changing when the image is modified or the screen size differs
+        """
+        if mtime is None:
+            mtime = os.stat(filepath).st_mtime
+
+        key = hashlib.sha1(f"{os.path.abspath(filepath)}{mtime}".encode()).hexdigest()
+
+        return os.path.join(THUMBNAIL_DIR, f"{key}_{self.screen_w}x{self.screen_h}.jpg")
+
+    def _prune_thumbnails(self):
+        """
+        Remove thumbnails not used for a long time, then the least recently used ones until the cache fits its max size
+        """
+        try:
+            with os.scandir(THUMBNAIL_DIR) as entries:
+                thumbnails = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries if entry.is_file()]
+        except OSError:
+            return
+
+        now = time.time()
+        total_size = sum(size for _, size, _ in thumbnails)
+
+        for mtime, size, path in sorted(thumbnails):
+            if now - mtime < THUMBNAIL_MAX_AGE and total_size <= THUMBNAIL_MAX_SIZE:
+                break
+
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass
+
+    def _letterbox(self, image: Image) -> Image:
+        """
+        Center the image on a black screen sized frame so it can be pasted in the displayed photo
+        """
+        frame = Image.new("RGB", (self.screen_w, self.screen_h))
+        position = (self._cx - image.width // 2, self._cy - image.height // 2)
+        frame.paste(image, position, image if image.mode == "RGBA" else None)
+
+        return frame
+
+    def _render(self, prepared: tuple):
+        """
+        Display a loaded image and its information on the canvas
+        """
+        self.current_image, metadata = prepared
+        self.current_name = metadata["name"]
+
+        image_name = metadata["name"]
+        image_date = metadata["date"]
+        image_loc = metadata["location"]
+        image_alt = metadata["altitude"]
+
+        # Copy the pixels into the existing photo instead of creating a new one
+        self.photo_image.paste(self.current_image)
+
+        self.canvas.itemconfigure(self._date_id, text=image_date)
+        self.canvas.coords(self._loc_id, 20, self._bot_y_alt if image_alt else self._bot_y)
+        self.canvas.itemconfigure(self._loc_id, text=image_loc)
+        self.canvas.itemconfigure(self._alt_id, text=image_alt or "")
+        self.canvas.itemconfigure(self._name_id, text=image_name)
 
 
 
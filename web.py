@@ -2,6 +2,15 @@ import os, dotenv, glob
 from flask import Flask, render_template, request, redirect, url_for, session, send_from_directory
 from flask_assets import Bundle, Environment
 
+def needs_rebuild(output: str, sources: list) -> bool:
+    """
+    Check if the output file is missing or older than one of its sources
+    """
+    if not os.path.exists(output):
+        return True
+
+    return max((os.path.getmtime(s) for s in sources), default=0) > os.path.getmtime(output)
+
 class WebApp:
     def __init__(self, host: str, port: int, debug: bool):
         self.host = host
@@ -18,6 +27,9 @@ class WebApp:
 
         self.session = session
 
+        # Assets are only rebuilt on requests while debugging
+        self.app.config["ASSETS_AUTO_BUILD"] = self.debug
+
         bundles = {
             "scss": Bundle(
                 "../scss/style.scss",
@@ -41,9 +53,26 @@ class WebApp:
 
         assets = Environment(self.app)
         assets.register(bundles)
-        bundles["scss"].build(force=True)
-        bundles["cssmin"].build(force=True)
-        bundles["jsmin"].build(force=True)
+
+        # Bundles are built in order as cssmin depends on the scss output
+        for bundle in bundles.values():
+            if self.debug or needs_rebuild(self.static_path(bundle.output), self.bundle_sources(bundle)):
+                bundle.build(force=True)
+
+    def static_path(self, path: str) -> str:
+        """
+        Get the path of a bundle file, relative to the static folder
+        """
+        return os.path.normpath(os.path.join(self.app.static_folder, path))
+
+    def bundle_sources(self, bundle: Bundle) -> list:
+        """
+        Get all the source files of a bundle, including its dependencies
+        """
+        depends = [bundle.depends] if isinstance(bundle.depends, str) else list(bundle.depends)
+        patterns = [self.static_path(p) for p in list(bundle.contents) + depends]
+
+        return [f for p in patterns for f in glob.glob(p)]
 
     def load_routes(self):
         @self.app.errorhandler(404)